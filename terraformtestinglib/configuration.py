@@ -30,6 +30,7 @@ Main code for configuration.
    http://google.github.io/styleguide/pyguide.html
 
 """
+import functools
 import re
 from schema import Schema, Optional, And
 
@@ -44,16 +45,26 @@ __email__ = '''<ctyfoxylos@schubergphilis.com>'''
 __status__ = '''Development'''  # "Prototype", "Development", "Production".
 
 
+# bounded as the testing api compiles whatever regexes its users provide
+PATTERN_CACHE_SIZE = 1024
+
+
 def is_valid_regex(value):
-    """Validates a regex."""
+    """Validates a regex, caching the compiled pattern for later use."""
     try:
-        re.compile(value)
+        get_compiled_pattern(value)
         is_valid = True
     except re.error:
         is_valid = False
     return is_valid
 
 
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def get_compiled_pattern(value):
+    """Retrieves the compiled pattern of a regex, compiling and caching it on first use."""
+    return re.compile(value)
+
+
 NAMING_SCHEMA = Schema([{'resource': str,
                          'regex': is_valid_regex,
                          Optional('fields'): [{'value': str,
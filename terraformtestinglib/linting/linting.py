@@ -31,17 +31,24 @@ Main code for linting.
 
 """
 
+import copy
 import logging
 import os
-import re
 import warnings
 
 import yaml
 from yaml.parser import ParserError
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 from schema import SchemaError
 
 from terraformtestinglib.terraformtestinglib import Parser
-from terraformtestinglib.configuration import NAMING_SCHEMA, POSITIONING_SCHEMA, DISASTER_RECOVERY_FILENAME
+from terraformtestinglib.configuration import (NAMING_SCHEMA,
+                                               POSITIONING_SCHEMA,
+                                               DISASTER_RECOVERY_FILENAME,
+                                               get_compiled_pattern)
 from terraformtestinglib.terraformtestinglibexceptions import InvalidNaming, InvalidPositioning
 from terraformtestinglib.utils import RuleError, ResourceError, FilenameError, ConfigurationError
 
@@ -60,8 +67,13 @@ LOGGER_BASENAME = '''linting'''
 LOGGER = logging.getLogger(LOGGER_BASENAME)
 LOGGER.addHandler(logging.NullHandler())
 
+# Validated rule files keyed on their path along with the modification time and size they were loaded at
+NAMING_RULES_CACHE = {}
+POSITIONING_RULES_CACHE = {}
+RULES_CACHE_SIZE = 32
 
-class Stack(Parser):
+
+class Stack(Parser):  # pylint: disable=too-many-instance-attributes
     """Manages a stack as a collection of resources that can be checked for name convention."""
 
     def __init__(self,  # pylint: disable=too-many-arguments
@@ -80,18 +92,29 @@ class Stack(Parser):
         self.path = configuration_path
         self.rules_set = self._get_naming_rules(naming_file_path)
         self.positioning = self._get_positioning_rules(positioning_file_path)
+        self._positioning_index = PositioningSet(self.positioning) if self.positioning is not None else None
         self.positioning_skip_file = file_to_skip_for_positioning
         self.resources = self._get_resources()
         self._errors = []
 
     @staticmethod
-    def _get_naming_rules(rules_file):
+    def _load_rules_file(cache, rules_path_file, schema):
+        file_stats = os.stat(rules_path_file)
+        file_version = (file_stats.st_mtime_ns, file_stats.st_size)
+        version, rules = cache.pop(rules_path_file, (None, None))
+        if version != file_version:
+            with open(rules_path_file, 'rb') as rules_file_handle:
+                rules = schema.validate(yaml.load(rules_file_handle, Loader=SafeLoader))
+        # an edited file replaces its previous entry and the least recently used file is dropped past the limit
+        cache[rules_path_file] = (file_version, rules)
+        if len(cache) > RULES_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        # every stack gets its own copy as the rules end up in its public attributes
+        return copy.deepcopy(rules)
+
+    def _get_naming_rules(self, rules_file):
         try:
-            rules_path_file = os.path.expanduser(rules_file)
-            with open(rules_path_file, 'r') as rules_file_handle:
-                rules = yaml.load(rules_file_handle.read(), Loader=yaml.FullLoader)
-                rules_file_handle.close()
-            rules = NAMING_SCHEMA.validate(rules)
+            rules = self._load_rules_file(NAMING_RULES_CACHE, os.path.expanduser(rules_file), NAMING_SCHEMA)
         except IOError:
             raise InvalidNaming('Could not load naming file')
         except ParserError:
@@ -100,43 +123,35 @@ class Stack(Parser):
             raise InvalidNaming(error)
         return RuleSet(rules)
 
-    @staticmethod
-    def _get_positioning_rules(positioning_file):
+    def _get_positioning_rules(self, positioning_file):
         if positioning_file is None:
             return None
         try:
-            positioning_path_file = os.path.expanduser(positioning_file)
-            with open(positioning_path_file, 'r') as positioning_file_handle:
-                positioning = yaml.load(positioning_file_handle.read(), Loader=yaml.FullLoader)
-                positioning_file_handle.close()
-            positioning = POSITIONING_SCHEMA.validate(positioning)
+            return self._load_rules_file(POSITIONING_RULES_CACHE,
+                                         os.path.expanduser(positioning_file),
+                                         POSITIONING_SCHEMA)
         except IOError:
             raise InvalidPositioning('Could not load positioning file')
         except ParserError:
             raise InvalidPositioning('Unable to parse yaml file. Please check that it is valid.')
         except SchemaError as error:
             raise InvalidPositioning(error)
-        return positioning
 
     def _get_resources(self):
+        get_counter_data = self.hcl_view.get_counter_resource_data_by_type
+        get_data = self.hcl_view.get_resource_data_by_type
+        instantiate = self._instantiate_resource
         resources = []
-        for hcl_resource in self.hcl_resources:
-            if hcl_resource.data.get('count'):
-                for data in self.hcl_view.get_counter_resource_data_by_type(hcl_resource.resource_type,
-                                                                            hcl_resource.resource_name):
-                    resources.append(self._instantiate_resource(hcl_resource.filename,
-                                                                hcl_resource.resource_type,
-                                                                hcl_resource.resource_name,
-                                                                data,
-                                                                hcl_resource.data))
+        for filename, resource_type, resource_name, original_data in self.hcl_resources:
+            if original_data.get('count'):
+                resources.extend(instantiate(filename, resource_type, resource_name, data, original_data)
+                                 for data in get_counter_data(resource_type, resource_name))
             else:
-                resources.append(self._instantiate_resource(hcl_resource.filename,
-                                                            hcl_resource.resource_type,
-                                                            hcl_resource.resource_name,
-                                                            self.hcl_view.get_resource_data_by_type(
-                                                                hcl_resource.resource_type,
-                                                                hcl_resource.resource_name),
-                                                            hcl_resource.data))
+                resources.append(instantiate(filename,
+                                             resource_type,
+                                             resource_name,
+                                             get_data(resource_type, resource_name),
+                                             original_data))
         return resources
 
     def _instantiate_resource(self, filename, resource_type, name, data, original_data):  # pylint: disable=too-many-arguments
@@ -145,7 +160,7 @@ class Stack(Parser):
         if filename == self.positioning_skip_file:
             resource.register_positioning_set(None)
         else:
-            resource.register_positioning_set(self.positioning)
+            resource.register_positioning_set(self.positioning, self._positioning_index)
         return resource
 
     def validate(self):
@@ -156,10 +171,10 @@ class Stack(Parser):
 
         """
         self._errors = []
+        skip_positioning = bool(os.environ.get('SKIP_POSITIONING'))
         for resource in self.resources:
-            resource.validate()
-            for error in resource.errors:
-                self._errors.append(error)
+            resource.validate(skip_positioning)
+            self._errors.extend(resource.errors)
 
     @property
     def errors(self):
@@ -175,8 +190,10 @@ class Stack(Parser):
 class LintingResource:  # pylint: disable=too-many-instance-attributes
     """Manages a resource and provides validation capabilities.."""
 
+    # resources are instantiated in bulk so they share a single logger instead of looking it up per instance
+    _logger = logging.getLogger(f'{LOGGER_BASENAME}.LintingResource')
+
     def __init__(self, filename, resource_type, name, data, original_data):  # pylint: disable=too-many-arguments
-        self._logger = logging.getLogger(f'{LOGGER_BASENAME}.{self.__class__.__name__}')
         self.filename = filename
         self.name = name
         self.type = resource_type
@@ -184,10 +201,18 @@ class LintingResource:  # pylint: disable=too-many-instance-attributes
         self.original_data = original_data
         self.rules_set = None
         self.positioning_set = None
+        self._positioning_index = None
         self.errors = None
 
-    def __getattr__(self, value):
-        return self.data.get(value)
+    @property
+    def tags(self):
+        """The tags of the resource.
+
+        Returns:
+            tags (dict): The tags of the resource if any, None otherwise
+
+        """
+        return self.data.get('tags')
 
     def register_rules_set(self, rules_set):
         """Registers the set of rules with the Resource.
@@ -201,31 +226,36 @@ class LintingResource:  # pylint: disable=too-many-instance-attributes
         """
         self.rules_set = rules_set
 
-    def register_positioning_set(self, positioning_set):
+    def register_positioning_set(self, positioning_set, positioning_index=None):
         """Registers the set of rules with the Resource.
 
         Args:
             positioning_set (dict): A dictionary with the rules for the positioning convention
+            positioning_index (PositioningSet): The rules indexed by entity, built from the dictionary if not provided
 
         Returns:
             None
 
         """
+        if positioning_set is not None and positioning_index is None:
+            positioning_index = PositioningSet(positioning_set)
         self.positioning_set = positioning_set
+        self._positioning_index = positioning_index if positioning_set is not None else None
 
-    def _get_entity_desired_filename(self, entity):
-        target = next((filename for filename, entities in self.positioning_set.items()
-                       if entity in entities), 'unknown')
-        return target
-
-    def validate(self):
+    def validate(self, skip_positioning=None):
         """Validates the resource according to the appropriate rule.
 
+        Args:
+            skip_positioning (bool): Whether positioning should be skipped globally, if not provided the
+                "SKIP_POSITIONING" environment variable is checked
+
         Returns:
             True upon completion
 
         """
         self.errors = []
+        if skip_positioning is None:
+            skip_positioning = bool(os.environ.get('SKIP_POSITIONING'))
         validate_positioning = True
         if not self.rules_set:
             self._logger.warning('No rules set!')
@@ -235,84 +265,82 @@ class LintingResource:  # pylint: disable=too-many-instance-attributes
                        'being skipped.')
             self._logger.info(message)
             validate_positioning = False
-        elif os.environ.get('SKIP_POSITIONING'):
+        elif skip_positioning:
             self._logger.info('Skipping resource positioning due to global environment setting.')
             validate_positioning = False
-        self._logger.debug('Resource type %s', self.type)
-        self._validate_naming()
+        self._logger.debug('Validating resource %s of type %s', self.name, self.type)
+        tags = self._get_tags()
+        self._validate_naming(tags)
         if self.filename == DISASTER_RECOVERY_FILENAME:
             self._logger.info('Not validating entries for "%s"', DISASTER_RECOVERY_FILENAME)
             return True
         if validate_positioning:
-            self._validate_positioning()
+            self._validate_positioning(tags)
         return True
 
-    def _is_check_skipped(self, tag_name, deprecated_tag_name=None):
-        skip_check = False
-        try:
-            check_tag = tag_name
-            deprecated_tag = deprecated_tag_name
-            tags = self.tags or {}
-            if tags.get(deprecated_tag):
-                message = f'The tag "{deprecated_tag}" is deprecated. Please use "{check_tag}". Resource: {self.name}'
-                warnings.warn(message, PendingDeprecationWarning)
-                check_tag = deprecated_tag
-            skip_check = tags.get(check_tag, False)
-        except IndexError:
-            self._logger.error(('Weird error with no or broken resources '
-                                'found %s for resource %s' % self.data, self.name))
-        except AttributeError:
-            self._logger.exception('Multiple tags entry found on resource %s', self.name)
-        return skip_check
-
-    def _validate_positioning(self):
-        self._logger.debug('Resource name %s', self.name)
-        if self._is_check_skipped('skip-positioning', 'skip_positioning'):
+    def _get_tags(self):
+        tags = self.tags or {}
+        if not isinstance(tags, dict):
+            self._logger.error('Multiple tags entry found on resource %s', self.name)
+            return {}
+        return tags
+
+    def _is_check_skipped(self, tags, tag_name, deprecated_tag_name):
+        if tags.get(deprecated_tag_name):
+            message = f'The tag "{deprecated_tag_name}" is deprecated. Please use "{tag_name}". Resource: {self.name}'
+            warnings.warn(message, PendingDeprecationWarning)
+            return tags.get(deprecated_tag_name)
+        return tags.get(tag_name, False)
+
+    def _validate_positioning(self, tags):
+        # the skip tags are checked first so their deprecation is reported for every resource using them
+        if self._is_check_skipped(tags, 'skip-positioning', 'skip_positioning'):
             self._logger.warning('Skipping resource %s positioning checking '
                                  'due to user overriding tag.', self.name)
-        else:
-            full_desired_filename = self._get_entity_desired_filename(self.type)
-            desired_filename, _, _ = full_desired_filename.rpartition('.tf')
-            file_name, _, _ = self.filename.rpartition('.')
-            if not re.match(desired_filename, file_name):
-                self.errors.append(FilenameError(self.filename, self.name, full_desired_filename))
-                self._logger.error('Filename positioning not followed on file %s for resource '
-                                   '%s. Should be in a file matching %s.tf .',
-                                   self.filename,
-                                   self.name,
-                                   desired_filename)
+            return True
+        desired = self._positioning_index.get_desired_filename(self.type)
+        if desired is None:
+            self._logger.debug('No positioning rule for resource %s of type %s', self.name, self.type)
+            return True
+        full_desired_filename, desired_filename = desired
+        file_name, _, _ = self.filename.rpartition('.')
+        if not desired_filename.match(file_name):
+            self.errors.append(FilenameError(self.filename, self.name, full_desired_filename))
+            self._logger.error('Filename positioning not followed on file %s for resource '
+                               '%s. Should be in a file matching %s.tf .',
+                               self.filename,
+                               self.name,
+                               desired_filename.pattern)
         return True
 
-    def _validate_naming(self):
-        self._logger.debug('Resource name %s', self.name)
-        if self._is_check_skipped('skip-linting', 'skip_linting'):
+    def _validate_naming(self, tags):
+        if self._is_check_skipped(tags, 'skip-linting', 'skip_linting'):
             self._logger.warning('Skipping resource %s naming checking '
                                  'due to user overriding tag.', self.name)
-        else:
-            rule = self.rules_set.get_rule_for_resource(self.type)
-            if rule:
-                self._logger.debug('Found matching rule "%s"', rule.regex)
-                rule.validate(self.type, self.name, self.data, self.original_data)
-                for error in rule.errors:
-                    if isinstance(error, ConfigurationError):
-                        self._logger.error('Invalid configuration found on file %s for resource '
-                                           '%s with type %s . Invalid value found :%s',
-                                           self.filename,
-                                           error.entity,
-                                           error.field,
-                                           error.value)
-
-                    else:
-                        self._logger.error('Naming convention not followed on file %s for resource '
-                                           '%s with type %s. Regex not matched :%s. Value :%s',
-                                           self.filename,
-                                           error.entity,
-                                           error.field,
-                                           error.regex,
-                                           error.value)
-                    self.errors.append(ResourceError(self.filename, *error))
+            return True
+        rule = self.rules_set.get_rule_for_resource(self.type)
+        if rule is None:
+            self._logger.debug('No naming rule for resource %s of type %s', self.name, self.type)
+            return True
+        self._logger.debug('Found matching rule "%s"', rule.regex)
+        for error in rule.validate(self.type, self.name, self.data, self.original_data):
+            if isinstance(error, ConfigurationError):
+                self._logger.error('Invalid configuration found on file %s for resource '
+                                   '%s with type %s . Invalid value found :%s',
+                                   self.filename,
+                                   error.entity,
+                                   error.field,
+                                   error.value)
+
             else:
-                self._logger.debug('No matching rule found')
+                self._logger.error('Naming convention not followed on file %s for resource '
+                                   '%s with type %s. Regex not matched :%s. Value :%s',
+                                   self.filename,
+                                   error.entity,
+                                   error.field,
+                                   error.regex,
+                                   error.value)
+            self.errors.append(ResourceError(self.filename, *error))
         return True
 
 
@@ -320,7 +348,9 @@ class RuleSet:  # pylint: disable=too-few-public-methods
     """Manages the rules as a group and can search them by name."""
 
     def __init__(self, rules):
-        self._rules = rules
+        self._rules = {}
+        for rule in rules:
+            self._rules.setdefault(rule.get('resource'), Rule(rule))
 
     def get_rule_for_resource(self, resource_name):
         """Retrieves the rule for the resource name.
@@ -332,31 +362,47 @@ class RuleSet:  # pylint: disable=too-few-public-methods
             The rule corresponding with the resource type if found, None otherwise
 
         """
-        return next((Rule(rule) for rule in self._rules
-                     if rule.get('resource') == resource_name), None)
+        return self._rules.get(resource_name)
 
 
-class Rule:
-    """Handles the rule object providing validation capabilities."""
+class PositioningSet:  # pylint: disable=too-few-public-methods
+    """Manages the positioning rules as a group and can search them by entity type."""
 
-    def __init__(self, data):
-        self._logger = logging.getLogger(f'{LOGGER_BASENAME}.{self.__class__.__name__}')
-        self.data = data
-        self.regex = self.data.get('regex')
-        self._errors = []
+    def __init__(self, positioning):
+        self._entities = {}
+        for filename, entities in positioning.items():
+            desired_filename, _, _ = filename.rpartition('.tf')
+            pattern = get_compiled_pattern(desired_filename)
+            for entity in entities:
+                # an entity listed under several files is expected in the first of them
+                self._entities.setdefault(entity, (filename, pattern))
 
-    @property
-    def errors(self):
-        """List of errors found.
+    def get_desired_filename(self, entity):
+        """Retrieves the filename the entity should be positioned in.
+
+        Args:
+            entity (basestring): The resource type to retrieve the filename for
 
-        Returns: The errors found
+        Returns:
+            A tuple of the desired filename and the compiled pattern matching it, None if the entity is not positioned
 
         """
-        return self._errors
+        return self._entities.get(entity)
 
-    @errors.setter
-    def errors(self, error):
-        self._errors.append(error)
+
+class Rule:  # pylint: disable=too-few-public-methods
+    """Handles the rule object providing validation capabilities."""
+
+    _logger = logging.getLogger(f'{LOGGER_BASENAME}.Rule')
+
+    def __init__(self, data):
+        self.data = data
+        self.regex = self.data.get('regex')
+        self._pattern = get_compiled_pattern(self.regex) if self.regex else None
+        self._fields = tuple((field.get('value'),
+                              tuple(field.get('value').split('.')),
+                              get_compiled_pattern(field.get('regex')))
+                             for field in self.data.get('fields', []) if field.get('regex'))
 
     def validate(self, resource_type, resource_name, resource_data, original_data):
         """Validates the given resource based on the ruleset.
@@ -368,59 +414,56 @@ class Rule:
             original_data (dict): The original data of the resource, before the interpolation
 
         Returns:
-            True on successful validation, False otherwise
+            errors (list): The errors found, empty on successful validation
 
         """
+        # the errors are kept local as a rule is shared by all the stacks loading the same naming file
+        errors = []
         if not self.regex:
-            return True
-        self._validate_name(resource_type, resource_name)
-        self._validate_values(resource_type, resource_name, resource_data, original_data)
-        return True if not self.errors else False  # pylint: disable=simplifiable-if-expression
-
-    def _validate_name(self, resource_type, resource_name):
-        rule = re.compile(self.regex)
-        if not re.match(rule, resource_name):
-            self.errors = RuleError(resource_type, resource_name, 'id', self.regex, resource_name, None)
-
-    def _validate_values(self, resource_type, resource_name, resource_data, original_data):
-        for field in self.data.get('fields', []):
-            regex = field.get('regex')
-            if not regex:
-                continue
-            rule = re.compile(regex)
-            original_value, key_name = self._get_value_from_resource(original_data, field.get('value'))
-            value, key_name = self._get_value_from_resource(resource_data, field.get('value'))
-            original_value = original_value if original_value != value else None
-            rule_arguments = [resource_type, resource_name, field.get('value'), regex, value, original_value]
-            if isinstance(value, list):
-                for entry in value:
-                    # since there multiple occurances of the key we need to iterate all of them
-                    # and only use each ones value, that is why we overwrite the value for each iteration
-                    rule_arguments[4] = entry.get(key_name)
-                    self._match_rule_to_value(regex, rule, entry.get(key_name), rule_arguments)
-            else:
-                self._match_rule_to_value(regex, rule, value, rule_arguments)
+            return errors
+        self._validate_name(resource_type, resource_name, errors)
+        # most rules only check the resource name so skip the value lookups entirely for them
+        if self._fields:
+            self._validate_values(resource_type, resource_name, resource_data, original_data, errors)
+        return errors
+
+    def _validate_name(self, resource_type, resource_name, errors):
+        if not self._pattern.match(resource_name):
+            errors.append(RuleError(resource_type, resource_name, 'id', self.regex, resource_name, None))
+
+    def _validate_values(self, resource_type, resource_name, resource_data, original_data, errors):  # pylint: disable=too-many-arguments
+        for field_value, path, pattern in self._fields:
+            original_value, _ = self._get_value_from_resource(original_data, path)
+            value, key_name = self._get_value_from_resource(resource_data, path)
+            if original_value == value:
+                original_value = None
+            # if there are multiple occurrences of the key we need to match the value of each one of them
+            values = [entry.get(key_name) for entry in value] if isinstance(value, list) else [value]
+            for entry_value in values:
+                if not self._match_rule_to_value(pattern, entry_value):
+                    errors.append(RuleError(resource_type,
+                                            resource_name,
+                                            field_value,
+                                            pattern.pattern,
+                                            entry_value,
+                                            original_value))
+
+    def _match_rule_to_value(self, pattern, value):
+        if isinstance(value, str):
+            return bool(pattern.match(value))
+        self._logger.error('Error matching for regex, values passed were, rule:%s value:%s', pattern.pattern, value)
+        return True
 
-    def _match_rule_to_value(self, regex, rule, value, rule_arguments):
-        try:
-            if not re.match(rule, value):
-                self.errors = RuleError(*rule_arguments)
-        except TypeError:
-            self._logger.error('Error matching for regex, values passed were, rule:%s value:%s', regex, value)
-
-    def _get_value_from_resource(self, resource, value):
-        path = value.split('.')
-        for entry in path:
-            try:
-                field = resource.get(entry)
-            except AttributeError:
-                self._logger.error('Error getting field %s, failed for path %s', value, path)
-            resource = field
+    def _get_value_from_resource(self, resource, path):
+        for index, entry in enumerate(path):
+            if not isinstance(resource, dict):
+                self._logger.error('Error getting field %s, failed for path %s', '.'.join(path), path)
+                return None, None
+            resource = resource.get(entry)
             # if the resource is a list it means that there are multiple entries for the same key
             # so it needs to be handled on the calling code
             if isinstance(resource, list):
                 # we need to get the key name of the value that is a list.
                 # That should be the one after we just iterated over.
-                keys_path = value.split('.')
-                return resource, keys_path.pop(keys_path.index(entry) + 1)
+                return resource, path[index + 1]
         return resource, None
@@ -31,17 +31,22 @@ Main code for terraformtestinglib.
 
 """
 
+import ast
+import bisect
 import copy
-import glob
+import json
 import logging
+import operator
 import os
 import platform
 import re
+import threading
 import warnings
 from ast import literal_eval
 from collections import namedtuple
 
 import hcl
+from hcl.parser import HclParser
 from colorama import init
 
 from .terraformtestinglibexceptions import MissingVariable
@@ -77,12 +82,120 @@ else:
     init()
 
 
+# look for '(' ending in ')' pattern
+PARENTHESES_PATTERN = re.compile(r'\(.*\)')
+# look for '${' ending in '}' pattern, stopping at the first '}'
+INTERPOLATION_PATTERN = re.compile(r'\${.+?\}')
+# look for a '${var.' or '(var.' reference capturing the variable name and any '[' ending in ']' index
+VARIABLE_PATTERN = re.compile(r'(?:\${|\()var\.(?P<name>[^})\[]*)(?P<index>\[[^})]*\])?')
+
+# an integer optionally followed by an addition or subtraction of another one, like an interpolated "count.index + 1"
+INTEGER_ARITHMETIC_PATTERN = re.compile(r'\s*(?P<left>[-+]?\d+)\s*(?:(?P<operator>[-+])\s*(?P<right>\d+))?\s*$')
+ARITHMETIC_OPERATORS = {ast.Add: operator.add,
+                        ast.Sub: operator.sub,
+                        ast.Mult: operator.mul,
+                        ast.Div: operator.truediv,
+                        ast.FloorDiv: operator.floordiv,
+                        ast.Mod: operator.mod,
+                        ast.UAdd: operator.pos,
+                        ast.USub: operator.neg}
+
+
+def evaluate_arithmetic_expression(expression):
+    """Safely evaluates an expression of literals combined with basic arithmetic operators.
+
+    Args:
+        expression (basestring): The expression to evaluate, like "0 + 1"
+
+    Raises:
+        ValueError: If the expression contains anything other than literals and arithmetic operators
+
+    Returns:
+        The value of the expression
+
+    """
+    match = INTEGER_ARITHMETIC_PATTERN.match(expression)
+    if match:
+        left, operator_, right = match.group('left', 'operator', 'right')
+        if not operator_:
+            return int(left)
+        return int(left) + int(right) if operator_ == '+' else int(left) - int(right)
+
+    def evaluate(node):
+        if isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC_OPERATORS:
+            return ARITHMETIC_OPERATORS[type(node.op)](evaluate(node.left), evaluate(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in ARITHMETIC_OPERATORS:
+            return ARITHMETIC_OPERATORS[type(node.op)](evaluate(node.operand))
+        # anything else has to be a plain literal, literal_eval raises ValueError otherwise
+        return literal_eval(node)
+
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as error:
+        raise ValueError(f'Unsupported expression "{expression}"') from error
+    return evaluate(tree.body)
+
+
+# the parser keeps the state of a parse on its instance so it can only be shared within a thread
+HCL_PARSERS = threading.local()
+
+
+def get_hcl_parser():
+    """Retrieves the hcl parser of the current thread, building it on first use.
+
+    Building the parser generates its parsing tables which is by far the most expensive part of loading a file,
+    so a single instance is shared for all the loading done by a thread.
+
+    Returns:
+        HclParser : The hcl parser
+
+    """
+    parser = getattr(HCL_PARSERS, 'parser', None)
+    if parser is None:
+        parser = HCL_PARSERS.parser = HclParser()
+    return parser
+
+
+def load_hcl(file_handle):
+    """Deserializes a file like object with hcl or json contents into a dictionary.
+
+    Args:
+        file_handle: An object that has a read() method
+
+    Raises:
+        ValueError: If the contents could not be parsed
+
+    Returns:
+        dict : The parsed contents
+
+    """
+    contents = file_handle.read()
+    if hcl.api.isHcl(contents):
+        return get_hcl_parser().parse(contents)
+    return json.loads(contents)
+
+
+# parsed terraform files keyed on their path along with the modification time and size they were parsed at
+PARSED_FILES_CACHE = {}
+PARSED_FILES_CACHE_SIZE = 256
+
 HclFileResource = namedtuple('HclFileResource', ('filename', 'resource_type', 'resource_name', 'data'))
 
 
 class HclView:  # pylint: disable=too-many-instance-attributes
     """Object representing the global view of hcl resources along with any global variables."""
 
+    __slots__ = ('_logger',
+                 'state',
+                 '_raise_on_missing_variable',
+                 '_environment_variables',
+                 '_variable_values',
+                 '_resource_names_index',
+                 'resources',
+                 'data',
+                 'terraform',
+                 'provider')
+
     def __init__(self,
                  hcl_resources,
                  global_variables=None,
@@ -94,86 +207,82 @@ class HclView:  # pylint: disable=too-many-instance-attributes
         self.state = RecursiveDictionary()
         self._raise_on_missing_variable = raise_on_missing_variable
         self._environment_variables = environment_variables if environment_variables else {}
+        self._variable_values = {}
+        self._resource_names_index = {}
         if global_variables and isinstance(global_variables, dict):
             self.state.update({'variable': global_variables})
         for hcl_resource in hcl_resources:
             self._add_hcl_resource(hcl_resource)
-        self.resources = self._interpolate_state(copy.deepcopy(self.state.get('resource', {})))
-        self.data = self._interpolate_state(copy.deepcopy(self.state.get('data', {})))
-        self.terraform = self._interpolate_state(copy.deepcopy(self.state.get('terraform', {})))
-        self.provider = self._interpolate_state(copy.deepcopy(self.state.get('provider', {})))
+        # interpolation builds new dictionaries all the way down, leaving the state untouched so it needs no copying
+        self.resources = self._interpolate_state(self.state.get('resource', {}))
+        self.data = self._interpolate_state(self.state.get('data', {}))
+        self.terraform = self._interpolate_state(self.state.get('terraform', {}))
+        self.provider = self._interpolate_state(self.state.get('provider', {}))
 
     def _add_hcl_resource(self, data):
         self.state.update(self._filter_empty_variables(data))
 
     @staticmethod
     def _filter_empty_variables(data):
-        if 'variable' not in data.keys():
+        if 'variable' not in data:
             return data
         data['variable'] = {key: value.get('default')
-                            for key, value in data.get('variable').items() if value}
+                            for key, value in (data['variable'] or {}).items() if value}
         return data
 
     def _interpolate_state(self, state):
         output = {}
         for resources_type, resources_entries in state.items():
             if not isinstance(resources_entries, dict):
-                entry = {resources_type: resources_entries}
-                output[resources_type] = entry
+                output.update(self._interpolate_value({resources_type: {resources_type: resources_entries}}))
                 continue
             entry = {}
             for resource_name, resource_data in resources_entries.items():
-                try:
-                    counter = resource_data.get('count')
-                except AttributeError:
-                    counter = None
+                counter = resource_data.get('count') if isinstance(resource_data, dict) else None
                 if counter:
-                    for number in range(int(self._interpolate_variable(counter))):
-                        name = f'resource_name.{number}'
-                        data = self._interpolate_counter(copy.deepcopy(resource_data), str(number))
-                        entry[name] = data
+                    for number in map(str, range(int(self._interpolate_variable(counter)))):
+                        entry['resource_name.' + number] = self._interpolate_value(resource_data, number)
                 else:
-                    entry[resource_name] = resource_data
-            output[resources_type] = entry
-        state = self._interpolate_value(output)
-        return state
-
-    def _interpolate_value(self, data):
-        output = {}
-        for key, value in data.items():
-            if isinstance(key, str):
-                key = self._interpolate_variable(key)
-            if isinstance(value, str):
-                value = self._interpolate_variable(value)
-            elif isinstance(value, dict):
-                value = self._interpolate_value(value)
-            output[key] = value
+                    entry.update(self._interpolate_value({resource_name: resource_data}))
+            output[self._interpolate_variable(resources_type)] = entry
         return output
 
-    def _interpolate_counter(self, data, number):
+    def _interpolate_value(self, data, number=None):
         output = {}
-        for key, value in data.items():
-            key = key.replace('count.index', number)
-            if isinstance(value, str):
-                value = value.replace('count.index', number)
-            if isinstance(value, dict):
-                value = self._interpolate_counter(value, number)
-            output[key] = value
+        # walk the nested dictionaries with an explicit stack of (source, interpolated copy) pairs
+        stack = [(data, output)]
+        while stack:
+            source, target = stack.pop()
+            for key, value in source.items():
+                # keys rarely hold anything to interpolate so only pay for the call when they might
+                if isinstance(key, str) and (number is not None or '${' in key):
+                    key = self._interpolate_string(key, number)
+                if isinstance(value, str):
+                    value = self._interpolate_string(value, number)
+                elif isinstance(value, dict):
+                    nested = {}
+                    stack.append((value, nested))
+                    value = nested
+                target[key] = value
         return output
 
+    def _interpolate_string(self, value, number=None):
+        # the counter is interpolated first as the index may be part of a variable reference
+        if number is not None:
+            value = value.replace('count.index', number)
+        return self._interpolate_variable(value)
+
     @staticmethod
     def _interpolate_format(value):
-        match = re.search(r'\(.*\)', value)  # look for '(' ending in ')' pattern
+        match = PARENTHESES_PATTERN.search(value)
         if match:
             contents = match.group(0)[1:-1]
-            value, argument = contents.split(',')
-            argument = eval(argument, {"__builtins__": {}})  # pylint: disable=eval-used
-            value = eval(' % '.join([value, str(argument)]), {"__builtins__": {}})  # pylint: disable=eval-used
+            format_string, argument = contents.rsplit(',', 1)
+            value = literal_eval(format_string.strip()) % evaluate_arithmetic_expression(argument)
         return value
 
     def _interpolate_length(self, value):
-        # look for '(' ending in ')' pattern
-        match = re.search(r'\(.*\)', value)
+        match = PARENTHESES_PATTERN.search(value)
         if match:
             return len(self.get_variable_value(match.group(0).strip()))
         return value
@@ -182,8 +291,11 @@ class HclView:  # pylint: disable=too-many-instance-attributes
         # if its a number pass through
         if isinstance(value, (int, float)):
             return value
-        # look for '${' ending in '}' pattern, stop at the first } and performing multiple matches
-        for match in re.finditer(r'\${.+?\}', value):
+        # most values are plain strings so skip the regex engine for them altogether
+        if '${' not in value:
+            return value
+        # performing multiple matches, one for each interpolation
+        for match in INTERPOLATION_PATTERN.finditer(value):
             regex = match.group(0)
             if regex.startswith('${var.'):
                 interpolated_value = self.get_variable_value(regex)
@@ -209,28 +321,28 @@ class HclView:  # pylint: disable=too-many-instance-attributes
             value (str): The value retrieved
 
         """
+        # the same variables are referenced throughout a plan so resolve each of them only once
+        if variable in self._variable_values:
+            return self._variable_values[variable]
+        value = self._resolve_variable_value(variable)
+        self._variable_values[variable] = value
+        return value
+
+    def _resolve_variable_value(self, variable):
         initial_value = variable
-        permutations = ('${var.', '(var.')
-        if variable.startswith(permutations):
-            variable_name = variable.split('var.')[1]
-            variable_name = variable_name.split('}')[0]
-            variable_name = variable_name.split(')')[0]
-            # look for '[' ending in ']' pattern
-            match = re.search(r'\[.*\]', variable_name)
-            if match:
-                name = variable_name.split('[')[0]
+        match = VARIABLE_PATTERN.match(variable)
+        if match:
+            name, index = match.group('name', 'index')
+            if index:
                 variable = self.state.get('variable', {}).get(name, variable)
                 if isinstance(variable, dict):
-                    key = literal_eval(match.group(0))[0]
-                    variable = variable.get(key)
+                    variable = variable.get(literal_eval(index)[0])
                 elif isinstance(variable, list):
-                    index = literal_eval(match.group(0))[0]
-                    variable = variable[index]
+                    variable = variable[literal_eval(index)[0]]
             else:
                 # we look into the variables set in the state and if nothing is there
                 # we look into the provided environment variables
-                variable = self.state.get('variable', {}).get(variable_name,
-                                                              self._environment_variables.get(variable_name, variable))
+                variable = self.state.get('variable', {}).get(name, self._environment_variables.get(name, variable))
         if variable == initial_value and self._raise_on_missing_variable:
             raise MissingVariable(initial_value)
         return variable
@@ -259,13 +371,31 @@ class HclView:  # pylint: disable=too-many-instance-attributes
             Original non interpolated data (dict) for the provided resource name and resource type
 
         """
-        return [data for resource, data in self.resources.get(resource_type, {}).items()
-                if resource.startswith(resource_name)]
+        resources = self.resources.get(resource_type, {})
+        index = self._get_resource_names_index(resource_type)
+        matching = []
+        # all names starting with the resource name are sorted right after it so stop at the first one not matching
+        for position in range(bisect.bisect_left(index, (resource_name,)), len(index)):
+            name, order = index[position]
+            if not name.startswith(resource_name):
+                break
+            matching.append((order, name))
+        return [resources[name] for _, name in sorted(matching)]
+
+    def _get_resource_names_index(self, resource_type):
+        index = self._resource_names_index.get(resource_type)
+        if index is None:
+            # resource names sorted along with their original order so matches can be returned in that order
+            index = sorted((name, order) for order, name in enumerate(self.resources.get(resource_type, {})))
+            self._resource_names_index[resource_type] = index
+        return index
 
 
 class Parser:  # pylint: disable=too-few-public-methods
     """Manages the parsing of terraform files and creating the global hcl view from them."""
 
+    __slots__ = ('_logger', 'hcl_view', 'file_resources', 'hcl_resources')
+
     def __init__(self,
                  configuration_path,
                  global_variables_file_path=None,
@@ -286,26 +416,50 @@ class Parser:  # pylint: disable=too-few-public-methods
         try:
             global_variables_file_path = os.path.expanduser(global_variables_file)
             with open(global_variables_file_path, 'r') as globals_file:
-                global_variables = hcl.load(globals_file)
+                global_variables = load_hcl(globals_file)
         except ValueError:
             self._logger.warning('Could not parse %s for resources', global_variables_file)
             global_variables = {}
         return global_variables
 
+    def _get_terraform_files(self, path):
+        try:
+            with os.scandir(path) as entries:
+                # hidden files are skipped same as a '*.tf' glob would
+                return [entry for entry in entries
+                        if entry.name.endswith('.tf') and not entry.name.startswith('.') and entry.is_file()]
+        except OSError:
+            self._logger.warning('Could not read terraform files from %s', path)
+            return []
+
+    def _load_terraform_file(self, entry):
+        # the directory entry caches its stat so the cache key costs at most one call per file
+        file_stats = entry.stat()
+        tf_file_path = entry.path
+        file_version = (file_stats.st_mtime_ns, file_stats.st_size)
+        version, data = PARSED_FILES_CACHE.pop(tf_file_path, (None, None))
+        if version != file_version:
+            self._logger.debug('Trying to load file :%s', tf_file_path)
+            with open(tf_file_path, 'r') as terraform_file:
+                data = load_hcl(terraform_file)
+        # an edited file replaces its previous entry and the least recently used file is dropped past the limit
+        PARSED_FILES_CACHE[tf_file_path] = (file_version, data)
+        if len(PARSED_FILES_CACHE) > PARSED_FILES_CACHE_SIZE:
+            del PARSED_FILES_CACHE[next(iter(PARSED_FILES_CACHE))]
+        # every parser gets its own copy as the data ends up in its public attributes and gets updated in place
+        return copy.deepcopy(data)
+
     def _parse_path(self, path):
         hcl_resources = []
         file_resources = []
-        path = os.path.expanduser(os.path.join(path, '*.tf'))
-        for tf_file_path in glob.glob(path):
-            _, _, filename = tf_file_path.rpartition(os.path.sep)
+        for entry in self._get_terraform_files(os.path.expanduser(path)):
+            filename = entry.name
             try:
-                self._logger.debug('Trying to load file :%s', tf_file_path)
-                with open(tf_file_path, 'r') as terraform_file:
-                    data = hcl.load(terraform_file)
+                data = self._load_terraform_file(entry)
                 file_resources.append(data)
-                for resource_type, resource in data.get('resource', {}).items():
-                    for resource_name, resource_data in resource.items():
-                        hcl_resources.append(HclFileResource(filename, resource_type, resource_name, resource_data))
+                hcl_resources.extend(HclFileResource(filename, resource_type, resource_name, resource_data)
+                                     for resource_type, resource in data.get('resource', {}).items()
+                                     for resource_name, resource_data in resource.items())
             except ValueError:
                 self._logger.debug('Could not parse %s for resources', filename)
         return file_resources, hcl_resources
@@ -34,13 +34,13 @@ Main code for testing.
 import functools
 import json
 import logging
-import re
 import typing
 from operator import attrgetter
 from dataclasses import dataclass
 
 
 from terraformtestinglib.terraformtestinglib import Parser
+from terraformtestinglib.configuration import get_compiled_pattern
 
 __author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
 __docformat__ = '''google'''
@@ -57,6 +57,17 @@ LOGGER_BASENAME = '''testing'''
 LOGGER = logging.getLogger(LOGGER_BASENAME)
 LOGGER.addHandler(logging.NullHandler())
 
+# all entity lists are ordered by name, sharing the key function saves building one per call
+SORT_BY_NAME = attrgetter('name')
+
+# marks an attribute missing from an entity so a single dictionary lookup tells it apart from any actual value
+_MISSING = object()
+
+# json documents, including the NaN and Infinity the json module accepts, can only start with one of these after
+# leading json whitespace, so anything else is rejected without raising and catching a decoding error
+JSON_WHITESPACE = ' \t\n\r'
+JSON_START_CHARACTERS = frozenset('{["-0123456789tfnNI')
+
 
 def assert_on_error(func):
     """Raises assertion error exceptions if the wrapped method returned any errors."""
@@ -65,7 +76,9 @@ def assert_on_error(func):
         """Wrapped method."""
         value, errors = func(*args, **kwargs)
         if errors:
-            raise AssertionError('\n\t' + '\n\t'.join(sorted(errors)))
+            # the error list is built by the wrapped method for this call only so it can be sorted in place
+            errors.sort()
+            raise AssertionError('\n\t' + '\n\t'.join(errors))
         return value
 
     return wrapped
@@ -75,6 +88,9 @@ def assert_on_error(func):
 class Entity:
     """Basic model of an entity exposing required attributes."""
 
+    # declared by hand as dataclass(slots=True) is not available on all the supported python versions
+    __slots__ = ('type', 'name', 'data')
+
     type: str
     name: str
     data: typing.Any
@@ -84,21 +100,29 @@ class Entity:
 class Resource(Entity):
     """Basic model of a resource exposing required attributes."""
 
+    __slots__ = ()
+
 
 @dataclass
 class Data(Entity):
     """Basic model of a data object exposing required attributes."""
 
+    __slots__ = ()
+
 
 @dataclass
 class Provider(Entity):
     """Basic model of a provider object exposing required attributes."""
 
+    __slots__ = ()
+
 
 @dataclass
 class Terraform(Entity):
     """Basic model of a provider object exposing required attributes."""
 
+    __slots__ = ()
+
 
 class Validator(Parser):
     """Object exposing resources and variables of terraform plans."""
@@ -114,6 +138,7 @@ class Validator(Parser):
                                         environment_variables)
         self._logger = logging.getLogger(f'{LOGGER_BASENAME}.{self.__class__.__name__}')
         self.error_on_missing_attribute = False
+        self._resources_by_type = {}
 
     def resources(self, type_):
         """Filters resources based on resource type which is always cast to list.
@@ -125,17 +150,29 @@ class Validator(Parser):
             ResourceList : An object containing the resources matching the type provided
 
         """
-        resource_types = self.to_list(type_)
+        resource_types = list(dict.fromkeys(self.to_list(type_)))
         resources = []
-        for resource_type, resource in self.hcl_view.resources.items():
-            if resource_type in resource_types:
-                for resource_name, resource_data in resource.items():
-                    if resource_data.get('tags', {}).get('skip-testing'):
-                        self._logger.warning('Skipping resource %s testing '
-                                             'due to user overriding tag.', resource_name)
-                    else:
-                        resources.append(Resource(resource_type, resource_name, resource_data))
-        return ResourceList(self, sorted(resources, key=attrgetter('name')))
+        # look up only the requested types, once each, instead of scanning all the types of the state
+        for resource_type in resource_types:
+            resources.extend(self._get_resources_of_type(resource_type))
+        # the per type lists are already sorted so they only need merging when more types are requested
+        if len(resource_types) > 1:
+            resources.sort(key=SORT_BY_NAME)
+        return ResourceList(self, resources)
+
+    def _get_resources_of_type(self, resource_type):
+        resources = self._resources_by_type.get(resource_type)
+        if resources is None:
+            resources = []
+            for resource_name, resource_data in self.hcl_view.resources.get(resource_type, {}).items():
+                if resource_data.get('tags', {}).get('skip-testing'):
+                    self._logger.warning('Skipping resource %s testing '
+                                         'due to user overriding tag.', resource_name)
+                else:
+                    resources.append(Resource(resource_type, resource_name, resource_data))
+            resources.sort(key=SORT_BY_NAME)
+            self._resources_by_type[resource_type] = resources
+        return resources
 
     def data(self, type_):
         """Filters data based on data type which is always cast to list.
@@ -174,12 +211,11 @@ class Validator(Parser):
         return self._entity('terraform', Terraform, TerraformList, type_)
 
     def _entity(self, state_object, entity_object, entity_container, entity_type):
-        types = self.to_list(entity_type)
-        output_list = []
-        for _type, data in getattr(self.hcl_view, state_object).items():
-            if _type in types:
-                output_list.append(entity_object(_type, _type, data))
-        return entity_container(self, sorted(output_list, key=attrgetter('name')))
+        state = getattr(self.hcl_view, state_object)
+        output_list = [entity_object(_type, _type, state[_type])
+                       for _type in dict.fromkeys(self.to_list(entity_type)) if _type in state]
+        output_list.sort(key=SORT_BY_NAME)
+        return entity_container(self, output_list)
 
     def variable(self, name):
         """Returns a variable object of the provided name.
@@ -224,9 +260,12 @@ class Validator(Parser):
 class Container:
     """An object handling the exposing of attributes of different resources of terraform."""
 
+    # every filter creates a new container so the logger is looked up once per class instead of per instance
+    _logger = logging.getLogger(f'{LOGGER_BASENAME}.Container')
+
     def __init__(self, validator_instance, entities):
-        self._logger = logging.getLogger(f'{LOGGER_BASENAME}.{self.__class__.__name__}')
         self.validator = validator_instance
+        # the validator hands entities over sorted by name and filtering keeps their order so they need no resorting
         self.__entities = entities
 
     @property
@@ -250,15 +289,16 @@ class Container:
         errors = []
         attributes_list = []
         for entity in self._entities:
-            if not isinstance(entity.data, dict):
-                attributes_list.append(Attribute(entity, name, entity.data))
+            data = entity.data
+            if not isinstance(data, dict):
+                attributes_list.append(Attribute(entity, name, data))
                 continue
-            if name in entity.data.keys():
-                if isinstance(entity.data.get(name), list):
-                    for entry in entity.data.get(name):
-                        attributes_list.append(Attribute(entity, name, entry))
+            if name in data:
+                value = data[name]
+                if isinstance(value, list):
+                    attributes_list.extend(Attribute(entity, name, entry) for entry in value)
                 else:
-                    attributes_list.append(Attribute(entity, name, entity.data.get(name)))
+                    attributes_list.append(Attribute(entity, name, value))
             elif self.validator.error_on_missing_attribute:
                 errors.append(f"[{entity.type}.{entity.name}] should have attribute: '{name}'")
         return AttributeList(self.validator, attributes_list), errors
@@ -279,13 +319,12 @@ class Container:
         """
         errors = []
         attributes_list = []
+        pattern = get_compiled_pattern(regex)
         for resource in self._entities:
             matched = False
-            for attribute in resource.data.keys():
-                if re.search(regex, attribute):
-                    attributes_list.append(Attribute(resource,
-                                                     attribute,
-                                                     resource.data.get(attribute)))
+            for attribute, value in resource.data.items():
+                if pattern.search(attribute):
+                    attributes_list.append(Attribute(resource, attribute, value))
                     matched = True
             if self.validator.error_on_missing_attribute and not matched:
                 errors.append(f"[{resource.type}.{resource.name}] should have attribute matching regex: '{regex}'")
@@ -305,12 +344,11 @@ class Container:
             None
 
         """
-        attributes_list = self.validator.to_list(attributes_list)
+        attributes = set(self.validator.to_list(attributes_list))
         errors = []
         for resource in self._entities:
-            for attribute in attributes_list:
-                if attribute not in resource.data.keys():
-                    errors.append(f"[{resource.type}.{resource.name}] should have attribute: '{attribute}'")
+            errors.extend(f"[{resource.type}.{resource.name}] should have attribute: '{attribute}'"
+                          for attribute in attributes.difference(resource.data))
         return None, errors
 
     @assert_on_error
@@ -327,14 +365,19 @@ class Container:
             None
 
         """
-        attributes_list = self.validator.to_list(attributes_list)
+        attributes = set(self.validator.to_list(attributes_list))
         errors = []
         for resource in self._entities:
-            for attribute in attributes_list:
-                if attribute in resource.data.keys():
-                    errors.append(f"[{resource.type}.{resource.name}] should not have attribute(s): '{attribute}'")
+            errors.extend(f"[{resource.type}.{resource.name}] should not have attribute(s): '{attribute}'"
+                          for attribute in attributes.intersection(resource.data))
         return None, errors
 
+    @staticmethod
+    def _get_subattribute_value(entity, parent_attribute, attribute):
+        parent = entity.data.get(parent_attribute)
+        # a parent that is not a dictionary, like a list of repeated blocks, is treated as missing the child
+        return parent.get(attribute) if isinstance(parent, dict) else None
+
     def if_has_attribute(self, attribute):
         """Filters the entities based on the provided attribute.
 
@@ -345,11 +388,8 @@ class Container:
              (list) : An entities list object with all resources following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            if attribute in entity.data.keys():
-                entities.append(entity)
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        entities = [entity for entity in self._entities if attribute in entity.data]
+        return self.__class__(self.validator, entities)
 
     def if_not_has_attribute(self, attribute):
         """Filters the entities based on the non existence of the provided attribute.
@@ -361,11 +401,8 @@ class Container:
             (list)) : An entities list object with all entities following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            if attribute not in entity.data.keys():
-                entities.append(entity)
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        entities = [entity for entity in self._entities if attribute not in entity.data]
+        return self.__class__(self.validator, entities)
 
     def if_has_attribute_with_value(self, attribute, value):
         """Filters the entities based on the provided attribute and value.
@@ -378,13 +415,8 @@ class Container:
             (list) : An entities list object with all entities following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            if attribute in entity.data.keys():
-                attribute_value = entity.data.get(attribute)
-                if attribute_value == value:
-                    entities.append(entity)
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        entities = [entity for entity in self._entities if entity.data.get(attribute, _MISSING) == value]
+        return self.__class__(self.validator, entities)
 
     def if_not_has_attribute_with_value(self, attribute, value):
         """Filters the entities based on the provided attribute and value.
@@ -397,13 +429,10 @@ class Container:
             (list)) : An entities list object with all entities following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            if attribute in entity.data.keys():
-                attribute_value = entity.data.get(attribute)
-                if not attribute_value == value:
-                    entities.append(entity)
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        # membership compares by identity first, so a missing attribute is excluded same as an equal value
+        entities = [entity for entity in self._entities
+                    if entity.data.get(attribute, _MISSING) not in (_MISSING, value)]
+        return self.__class__(self.validator, entities)
 
     def if_has_attribute_with_regex_value(self, attribute, regex):
         """Filters the entities based on the provided attribute and value.
@@ -416,16 +445,10 @@ class Container:
             (list)) : An entities list object with all entities following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            if attribute in entity.data.keys():
-                attribute_value = entity.data.get(attribute)
-                try:
-                    if re.search(regex, attribute_value):
-                        entities.append(entity)
-                except TypeError:
-                    pass
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        pattern = get_compiled_pattern(regex)
+        entities = [entity for entity in self._entities
+                    if isinstance(entity.data.get(attribute), str) and pattern.search(entity.data[attribute])]
+        return self.__class__(self.validator, entities)
 
     def if_not_has_attribute_with_regex_value(self, attribute, regex):
         """Filters the entities based on the provided attribute and value.
@@ -438,16 +461,10 @@ class Container:
             (list)) : An entities list object with all entities following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            if attribute in entity.data.keys():
-                attribute_value = entity.data.get(attribute)
-                try:
-                    if not re.search(regex, attribute_value):
-                        entities.append(entity)
-                except TypeError:
-                    pass
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        pattern = get_compiled_pattern(regex)
+        entities = [entity for entity in self._entities
+                    if isinstance(entity.data.get(attribute), str) and not pattern.search(entity.data[attribute])]
+        return self.__class__(self.validator, entities)
 
     def if_has_subattribute(self, parent_attribute, attribute):
         """Filters the entities based on the provided parent and child attribute.
@@ -460,12 +477,9 @@ class Container:
             (list) : An entities list object with all entities following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            parent = entity.data.get(parent_attribute, {})
-            if parent.get(attribute):
-                entities.append(entity)
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        entities = [entity for entity in self._entities
+                    if self._get_subattribute_value(entity, parent_attribute, attribute)]
+        return self.__class__(self.validator, entities)
 
     def if_not_has_subattribute(self, parent_attribute, attribute):
         """Filters the entities based on the provided parent and child attribute.
@@ -478,12 +492,9 @@ class Container:
             (list) : An entities list object with all entities following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            parent = entity.data.get(parent_attribute, {})
-            if not parent.get(attribute):
-                entities.append(entity)
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        entities = [entity for entity in self._entities
+                    if not self._get_subattribute_value(entity, parent_attribute, attribute)]
+        return self.__class__(self.validator, entities)
 
     def if_has_subattribute_with_value(self, parent_attribute, attribute, value):
         """Filters the entities based on the provided parent and child attribute and value.
@@ -497,15 +508,9 @@ class Container:
             (list) : An entities list object with all entities following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            parent = entity.data.get(parent_attribute, {})
-            try:
-                if value == parent.get(attribute):
-                    entities.append(entity)
-            except TypeError:
-                pass
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        entities = [entity for entity in self._entities
+                    if value == self._get_subattribute_value(entity, parent_attribute, attribute)]
+        return self.__class__(self.validator, entities)
 
     def if_not_has_subattribute_with_value(self, parent_attribute, attribute, value):
         """Filters the entities based on the provided parent and child attribute and value.
@@ -519,15 +524,9 @@ class Container:
             (list) : An entities list object with all entities following the pattern
 
         """
-        entities = []
-        for entity in self._entities:
-            parent = entity.data.get(parent_attribute, {})
-            try:
-                if not value == parent.get(attribute):
-                    entities.append(entity)
-            except TypeError:
-                pass
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+        entities = [entity for entity in self._entities
+                    if not value == self._get_subattribute_value(entity, parent_attribute, attribute)]
+        return self.__class__(self.validator, entities)
 
     def if_has_subattribute_with_regex_value(self, parent_attribute, attribute, regex):
         """Filters the entities based on the provided parent and child attribute and regex for value matching.
@@ -541,15 +540,13 @@ class Container:
             (list) : An entities list object with all entities following the pattern
 
         """
+        pattern = get_compiled_pattern(regex)
         entities = []
         for entity in self._entities:
-            parent = entity.data.get(parent_attribute, {})
-            try:
-                if re.search(regex, parent.get(attribute)):
-                    entities.append(entity)
-            except TypeError:
-                pass
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+            attribute_value = self._get_subattribute_value(entity, parent_attribute, attribute)
+            if isinstance(attribute_value, str) and pattern.search(attribute_value):
+                entities.append(entity)
+        return self.__class__(self.validator, entities)
 
     def if_not_has_subattribute_with_regex_value(self, parent_attribute, attribute, regex):
         """Filters the entities based on the provided parent and child attribute and regex for value matching.
@@ -563,32 +560,38 @@ class Container:
             (list) : An entities list object with all entities following the pattern
 
         """
+        pattern = get_compiled_pattern(regex)
         entities = []
         for entity in self._entities:
-            parent = entity.data.get(parent_attribute, {})
-            try:
-                if not re.search(regex, parent.get(attribute)):
-                    entities.append(entity)
-            except TypeError:
-                pass
-        return self.__class__(self.validator, sorted(entities, key=attrgetter('name')))
+            attribute_value = self._get_subattribute_value(entity, parent_attribute, attribute)
+            if isinstance(attribute_value, str) and not pattern.search(attribute_value):
+                entities.append(entity)
+        return self.__class__(self.validator, entities)
 
 
 class DataList(Container):
     """A list of data objects being capable to filter on specific requirements."""
 
+    _logger = logging.getLogger(f'{LOGGER_BASENAME}.DataList')
+
 
 class ProviderList(Container):
     """A list of provider objects being capable to filter on specific requirements."""
 
+    _logger = logging.getLogger(f'{LOGGER_BASENAME}.ProviderList')
+
 
 class TerraformList(Container):
     """A list of terraform objects being capable to filter on specific requirements."""
 
+    _logger = logging.getLogger(f'{LOGGER_BASENAME}.TerraformList')
+
 
 class ResourceList(Container):
     """A list of resource objects being capable to filter on specific requirements."""
 
+    _logger = logging.getLogger(f'{LOGGER_BASENAME}.ResourceList')
+
     def resources(self, type_):
         """Filters resources based on resource type which is always cast to list.
 
@@ -602,19 +605,17 @@ class ResourceList(Container):
             ResourceList (list) : An object containing any resources matching the type
 
         """
-        resource_types = self.validator.to_list(type_)
-        resources = []
-        for resource in self._entities:
-            if resource.type in resource_types:
-                resources.append(resource)
-        return ResourceList(self.validator, sorted(resources, key=attrgetter('name')))
+        resource_types = set(self.validator.to_list(type_))
+        resources = [resource for resource in self._entities if resource.type in resource_types]
+        return ResourceList(self.validator, resources)
 
 
 class AttributeList:
     """Object containing attribute objects and providing validation methods for them."""
 
+    _logger = logging.getLogger(f'{LOGGER_BASENAME}.AttributeList')
+
     def __init__(self, validator, attributes):
-        self._logger = logging.getLogger(f'{LOGGER_BASENAME}.{self.__class__.__name__}')
         self.validator = validator
         self.attributes = attributes
 
@@ -632,12 +633,15 @@ class AttributeList:
         errors = []
         attributes = []
         for attribute in self.attributes:
-            if isinstance(attribute.value, list):
-                for entry in attribute.value:
-                    attributes.append(Attribute(attribute._resource, f'{attribute.name}.{name}', entry))  # pylint: disable=protected-access
+            resource = attribute._resource  # pylint: disable=protected-access
+            nested_name = f'{attribute.name}.{name}'
+            value = attribute.value
+            if isinstance(value, list):
+                attributes.extend(Attribute(resource, nested_name, entry) for entry in value)
             else:
-                if name in attribute.value.keys():
-                    attributes.append(Attribute(attribute._resource, f'{attribute.name}.{name}', attribute.value[name]))  # pylint: disable=protected-access
+                # values that are not dictionaries, like plain strings, cannot have the attribute so count as missing
+                if isinstance(value, dict) and name in value:
+                    attributes.append(Attribute(resource, nested_name, value[name]))
                 elif self.validator.error_on_missing_attribute:
                     errors.append(f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
                                   f"should have attribute: '{attribute.name}'")
@@ -675,13 +679,8 @@ class AttributeList:
             AttributeList : A container of attribute objects
 
         """
-        attributes = []
-        for attribute_ in self.attributes:
-            try:
-                if value == attribute_.value.get(attribute):
-                    attributes.append(attribute_)
-            except TypeError:
-                pass
+        attributes = [attribute_ for attribute_ in self.attributes
+                      if isinstance(attribute_.value, dict) and value == attribute_.value.get(attribute)]
         return AttributeList(self.validator, attributes)
 
     def if_not_has_attribute_with_value(self, attribute, value):
@@ -695,13 +694,8 @@ class AttributeList:
             AttributeList : A container of attribute objects
 
         """
-        attributes = []
-        for attribute_ in self.attributes:
-            try:
-                if not value == attribute_.value.get(attribute):
-                    attributes.append(attribute_)
-            except TypeError:
-                pass
+        attributes = [attribute_ for attribute_ in self.attributes
+                      if isinstance(attribute_.value, dict) and not value == attribute_.value.get(attribute)]
         return AttributeList(self.validator, attributes)
 
     @assert_on_error
@@ -740,11 +734,11 @@ class AttributeList:
 
         """
         errors = []
+        attributes = set(self.validator.to_list(attributes))
         for attribute in self.attributes:
-            for provided_attribute in self.validator.to_list(attributes):
-                if provided_attribute not in attribute.value.keys():
-                    errors.append(f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
-                                  f"should have attribute: '{provided_attribute}'")
+            errors.extend(f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
+                          f"should have attribute: '{provided_attribute}'"
+                          for provided_attribute in attributes.difference(attribute.value.keys()))
         return None, errors
 
     @assert_on_error
@@ -762,12 +756,11 @@ class AttributeList:
 
         """
         errors = []
-        attributes = self.validator.to_list(attributes)
+        attributes = set(self.validator.to_list(attributes))
         for attribute in self.attributes:
-            for required_property_name in attributes:
-                if required_property_name in attribute.value.keys():
-                    errors.append(f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
-                                  f"should not have attribute: '{required_property_name}'")
+            errors.extend(f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
+                          f"should not have attribute: '{required_property_name}'"
+                          for required_property_name in attributes.intersection(attribute.value.keys()))
         return None, errors
 
     @assert_on_error
@@ -785,12 +778,10 @@ class AttributeList:
 
         """
         errors = []
+        pattern = get_compiled_pattern(regex)
         for attribute in self.attributes:
-            try:
-                if not re.search(regex, attribute.value):
-                    errors.append(f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
-                                  f"with value '{attribute.value}' should match regex '{regex}'")
-            except (ValueError, TypeError, AttributeError):
+            # values that are not strings can never match
+            if not isinstance(attribute.value, str) or not pattern.search(attribute.value):
                 errors.append(f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
                               f"with value '{attribute.value}' should match regex '{regex}'")
         return None, errors
@@ -809,11 +800,10 @@ class AttributeList:
             None
 
         """
-        errors = []
-        for attribute in self.attributes:
-            if re.search(regex, attribute.value):
-                errors.append(f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
-                              f"with value '{attribute.value}' should not match regex '{regex}'")
+        search = get_compiled_pattern(regex).search
+        errors = [f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
+                  f"with value '{attribute.value}' should not match regex '{regex}'"
+                  for attribute in self.attributes if search(attribute.value)]
         return None, errors
 
     @assert_on_error
@@ -829,17 +819,29 @@ class AttributeList:
         """
         errors = []
         for attribute in self.attributes:
-            try:
-                json.loads(attribute.value)
-            except (ValueError, TypeError, AttributeError):
+            # only strings can hold json, anything else is reported without trying to parse it
+            if not isinstance(attribute.value, str) or not self._is_valid_json(attribute.value):
                 errors.append(f"[{attribute.resource_type}.{attribute.resource_name}.{attribute.name}] "
                               f"is not valid json")
         return None, errors
 
+    @staticmethod
+    def _is_valid_json(value):
+        contents = value.lstrip(JSON_WHITESPACE)
+        if not contents or contents[0] not in JSON_START_CHARACTERS:
+            return False
+        try:
+            json.loads(value)
+        except ValueError:
+            return False
+        return True
+
 
 class Variable:
     """Models a variable and exposes basic test for it."""
 
+    __slots__ = ('name', 'value')
+
     def __init__(self, name, value):
         self.name = name
         self.value = value
@@ -880,13 +882,15 @@ class Variable:
             None
 
         """
-        if not re.search(regex, self.value):
+        if not get_compiled_pattern(regex).search(self.value):
             raise AssertionError(f"Variable '{self.name}' value should match regex '{regex}'. Is: {self.value}")
 
 
 class Attribute:
     """Models the attribute."""
 
+    __slots__ = ('_resource', 'name', 'value')
+
     def __init__(self, resource, name, value):
         self._resource = resource
         self.name = name
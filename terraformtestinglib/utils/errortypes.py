@@ -45,6 +45,10 @@ __email__ = '''<ctyfoxylos@schubergphilis.com>'''
 __status__ = '''Development'''  # "Prototype", "Development", "Production".
 
 
+# every highlighted field of the messages is wrapped in the same escape codes so they are only built once
+HIGHLIGHT_START = fore.RED + style.BOLD  # pylint: disable=no-member
+HIGHLIGHT_END = style.RESET  # pylint: disable=no-member
+
 RuleError = namedtuple('RuleError', ['resource_type', 'entity', 'field', 'regex', 'value', 'original_value'])
 ConfigurationError = namedtuple('ConfigurationError',
                                 ['resource_type', 'entity', 'field', 'regex', 'value', 'original_value'])
@@ -53,6 +57,8 @@ ConfigurationError = namedtuple('ConfigurationError',
 class ResourceError:  # pylint: disable=too-few-public-methods
     """Models the Resource error and provides a nice printed version."""
 
+    __slots__ = ('filename', 'resource', 'entity', 'field', 'regex', 'value', 'original_value')
+
     def __init__(self, filename, resource, entity, field, regex, value, original_value):  # pylint: disable=too-many-arguments
         self.filename = filename
         self.resource = resource
@@ -63,40 +69,28 @@ class ResourceError:  # pylint: disable=too-few-public-methods
         self.original_value = original_value
 
     def __str__(self):
-        filename = (
-            fore.RED + style.BOLD + self.filename + '/' + self.resource + style.RESET)  # pylint: disable=no-member
-        resource = (fore.RED + style.BOLD + self.entity + style.RESET)  # pylint: disable=no-member
-        regex = (fore.RED + style.BOLD + self.regex + style.RESET)  # pylint: disable=no-member
-        value = (fore.RED + style.BOLD + self.value + style.RESET)  # pylint: disable=no-member
-        field = (fore.RED + style.BOLD + self.field + style.RESET)  # pylint: disable=no-member
-        text = ('Naming convention not followed on file {filename} for resource '
-                '{resource} for field {field}'
-                '\n\tRegex not matched : {regex}'
-                '\n\tValue             : {value}').format(filename=filename,
-                                                          resource=resource,
-                                                          regex=regex,
-                                                          value=value,
-                                                          field=field)
+        text = (f'Naming convention not followed on file '
+                f'{HIGHLIGHT_START}{self.filename}/{self.resource}{HIGHLIGHT_END} for resource '
+                f'{HIGHLIGHT_START}{self.entity}{HIGHLIGHT_END} for field {HIGHLIGHT_START}{self.field}{HIGHLIGHT_END}'
+                f'\n\tRegex not matched : {HIGHLIGHT_START}{self.regex}{HIGHLIGHT_END}'
+                f'\n\tValue             : {HIGHLIGHT_START}{self.value}{HIGHLIGHT_END}')
         if self.original_value:
-            original = (fore.RED + style.BOLD + self.original_value + style.RESET)  # pylint: disable=no-member
-            text += '\n\tOriginal Value    : {original}'.format(original=original)
+            text += f'\n\tOriginal Value    : {HIGHLIGHT_START}{self.original_value}{HIGHLIGHT_END}'
         return text
 
 
 class FilenameError:  # pylint: disable=too-few-public-methods
     """Models the Filename error and provides a nice printed version."""
 
+    __slots__ = ('filename', 'resource', 'target')
+
     def __init__(self, filename, resource, target):
         self.filename = filename
         self.resource = resource
         self.target = target
 
     def __str__(self):
-        filename = (
-            fore.RED + style.BOLD + self.filename + '/' + self.resource + style.RESET)  # pylint: disable=no-member
-        resource = (fore.RED + style.BOLD + self.resource + style.RESET)  # pylint: disable=no-member
-        target = (fore.RED + style.BOLD + self.target + style.RESET)  # pylint: disable=no-member
-        return ('Filename positioning not followed on file {filename} '
-                'for resource {resource}. \n\tShould be in file : {target}.').format(filename=filename,
-                                                                                     resource=resource,
-                                                                                     target=target)
+        return (f'Filename positioning not followed on file '
+                f'{HIGHLIGHT_START}{self.filename}/{self.resource}{HIGHLIGHT_END} '
+                f'for resource {HIGHLIGHT_START}{self.resource}{HIGHLIGHT_END}. '
+                f'\n\tShould be in file : {HIGHLIGHT_START}{self.target}{HIGHLIGHT_END}.')
@@ -31,6 +31,7 @@ Main code for utils.
 
 """
 
+from collections import deque
 
 __author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
 __docformat__ = '''google'''
@@ -51,6 +52,9 @@ class RecursiveDictionary(dict):
     them.
     """
 
+    # the dictionary whose merges created this one, only those merges may update it in place
+    _merged_by = None
+
     def update(self, other, **third):
         """Implements the recursion.
 
@@ -66,9 +70,19 @@ class RecursiveDictionary(dict):
 
     def iter_rec_update(self, iterator):
         """Updates recursively."""
-        for (key, value) in iterator:
-            if key in self and isinstance(self[key], dict) and isinstance(value, dict):
-                self[key] = RecursiveDictionary(self[key])
-                self[key].update(value)
-            else:
-                self[key] = value
+        # walk the nested dictionaries with a queue of (target, items to merge) pairs, merging them in the order
+        # they were given so that the last value of a key repeated in the items still wins
+        pending = deque([(self, iterator)])
+        while pending:
+            target, items = pending.popleft()
+            for (key, value) in items:
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    # copy a member dictionary the first time it gets merged into, from then on it is ours
+                    # while any dictionary adopted from a source, even a recursive one, is left untouched
+                    if getattr(current, '_merged_by', None) is not self:
+                        current = target[key] = RecursiveDictionary(current)
+                        current._merged_by = self  # pylint: disable=protected-access
+                    pending.append((current, value.items()))
+                else:
+                    target[key] = value
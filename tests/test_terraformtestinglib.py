@@ -35,13 +35,16 @@ Tests for `terraformtestinglib` module.
 
 import warnings
 import os
+import threading
 
 import unittest
+from unittest import mock
 from terraformtestinglib import Stack, Validator
-from terraformtestinglib.terraformtestinglib import HclView
+from terraformtestinglib.linting.linting import RuleSet, NAMING_RULES_CACHE, POSITIONING_RULES_CACHE
+from terraformtestinglib.terraformtestinglib import HclView, Parser, evaluate_arithmetic_expression, get_hcl_parser
 from terraformtestinglib.terraformtestinglibexceptions import InvalidNaming, InvalidPositioning, MissingVariable
-from terraformtestinglib.configuration import is_valid_regex
-from terraformtestinglib.utils import ResourceError, FilenameError
+from terraformtestinglib.configuration import is_valid_regex, get_compiled_pattern
+from terraformtestinglib.utils import ResourceError, FilenameError, RecursiveDictionary
 
 __author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
 __docformat__ = '''google'''
@@ -56,27 +59,51 @@ __status__ = '''Development'''  # "Prototype", "Development", "Production".
 
 class TestLintingFeatures(unittest.TestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
-        Test set up
+        Test class set up
 
-        This is where you can setup things that you use throughout the tests. This method is called before every test.
+        This is where you can setup things that you use throughout the tests. This method is called once before all the
+        tests of the class.
         """
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        self.fixtures = os.path.join(current_dir, 'fixtures', 'linting')
-        self.stack_path = os.path.join(self.fixtures, 'stack')
-        self.naming_file = os.path.join(self.fixtures, 'naming.yaml')
-        self.interpolated_naming_file = os.path.join(self.fixtures, 'interpolated_naming.yaml')
-        self.count_interpolated_naming_file = os.path.join(self.fixtures, 'count_interpolated_naming.yaml')
-        self.globals_file = os.path.join(self.stack_path, 'global.tfvars')
-        self.broken_schema_naming_file = os.path.join(self.fixtures, 'broken_schema_naming.yaml')
-        self.broken_yaml_naming_file = os.path.join(self.fixtures, 'broken_yaml_naming.yaml')
-        self.positioning_file = os.path.join(self.fixtures, 'positioning.yaml')
-        self.broken_schema_positioning_file = os.path.join(self.fixtures, 'broken_schema_positioning.yaml')
-        self.broken_yaml_positioning_file = os.path.join(self.fixtures, 'broken_yaml_positioning.yaml')
+        cls.fixtures = os.path.join(current_dir, 'fixtures', 'linting')
+        cls.stack_path = os.path.join(cls.fixtures, 'stack')
+        cls.naming_file = os.path.join(cls.fixtures, 'naming.yaml')
+        cls.interpolated_naming_file = os.path.join(cls.fixtures, 'interpolated_naming.yaml')
+        cls.count_interpolated_naming_file = os.path.join(cls.fixtures, 'count_interpolated_naming.yaml')
+        cls.globals_file = os.path.join(cls.stack_path, 'global.tfvars')
+        cls.broken_schema_naming_file = os.path.join(cls.fixtures, 'broken_schema_naming.yaml')
+        cls.broken_yaml_naming_file = os.path.join(cls.fixtures, 'broken_yaml_naming.yaml')
+        cls.positioning_file = os.path.join(cls.fixtures, 'positioning.yaml')
+        cls.broken_schema_positioning_file = os.path.join(cls.fixtures, 'broken_schema_positioning.yaml')
+        cls.broken_yaml_positioning_file = os.path.join(cls.fixtures, 'broken_yaml_positioning.yaml')
+        cls._validated_stack = None
+        cls._validated_stack_errors = None
+
+    @classmethod
+    def get_validated_stack(cls):
+        """Validates the default stack once and shares it between the tests only reading its errors."""
+        if cls._validated_stack is None:
+            stack = Stack(cls.stack_path, cls.naming_file, cls.positioning_file, cls.globals_file)
+            stack.validate()
+            cls._validated_stack = stack
+        return cls._validated_stack
+
+    @classmethod
+    def get_validated_stack_errors(cls, error_type):
+        """Buckets the errors of the shared validated stack by their type in a single pass."""
+        if cls._validated_stack_errors is None:
+            cls._validated_stack_errors = {ResourceError: [], FilenameError: []}
+            for error in cls.get_validated_stack().errors:
+                cls._validated_stack_errors[type(error)].append(error)
+        return cls._validated_stack_errors[error_type]
 
     def test_regex_checking(self):
         self.assertFalse(is_valid_regex('['))
+        self.assertTrue(is_valid_regex('^node[0-9]+$'))
+        self.assertIs(get_compiled_pattern('^node[0-9]+$'), get_compiled_pattern('^node[0-9]+$'))
 
     def test_naming_file(self):
         self.assertRaises(InvalidNaming, Stack, self.stack_path, 'random/path', self.positioning_file,
@@ -97,23 +124,43 @@ class TestLintingFeatures(unittest.TestCase):
         assert isinstance(stack, Stack)
         stack.validate()
 
-    def test_global_positioning_skip(self):
-        os.environ['SKIP_POSITIONING'] = "true"
+    def test_rules_caching(self):
+        stack = Stack(self.stack_path, self.naming_file, self.positioning_file, self.globals_file)
+        other_stack = Stack(self.stack_path, self.naming_file, self.positioning_file, self.globals_file)
+        assert stack.rules_set is not other_stack.rules_set
+        assert stack.positioning == other_stack.positioning
+        assert stack.positioning is not other_stack.positioning
+        assert isinstance(stack.positioning, dict)
+        stack.positioning.clear()
+        assert Stack(self.stack_path, self.naming_file, self.positioning_file, self.globals_file).positioning
+        assert os.path.expanduser(self.naming_file) in NAMING_RULES_CACHE
+        assert os.path.expanduser(self.positioning_file) in POSITIONING_RULES_CACHE
+
+    def test_positioning_set_registration(self):
         stack = Stack(self.stack_path, self.naming_file, self.positioning_file, self.globals_file)
+        for resource in stack.resources:
+            resource.register_positioning_set(stack.positioning)
         stack.validate()
+        assert sum(1 for error in stack.errors if isinstance(error, FilenameError)) == 2
+
+    def test_rule_validation_keeps_no_state(self):
+        rule = RuleSet([{'resource': 'aws_instance', 'regex': '^node'}]).get_rule_for_resource('aws_instance')
+        errors = rule.validate('aws_instance', 'broken', {}, {})
+        assert rule.validate('aws_instance', 'node1', {}, {}) == []
+        assert len(errors) == 1
+
+    def test_global_positioning_skip(self):
+        with mock.patch.dict(os.environ, {'SKIP_POSITIONING': 'true'}):
+            stack = Stack(self.stack_path, self.naming_file, self.positioning_file, self.globals_file)
+            stack.validate()
         for error in stack.errors:
             assert not isinstance(error, FilenameError)
-        del os.environ['SKIP_POSITIONING']
 
     def test_positioning_errors(self):
-        stack = Stack(self.stack_path, self.naming_file, self.positioning_file, self.globals_file)
-        stack.validate()
-        assert len([error for error in stack.errors if isinstance(error, FilenameError)]) == 2
+        assert len(self.get_validated_stack_errors(FilenameError)) == 2
 
     def test_naming_errors(self):
-        stack = Stack(self.stack_path, self.naming_file, self.positioning_file, self.globals_file)
-        stack.validate()
-        assert len([error for error in stack.errors if isinstance(error, ResourceError)]) == 4
+        assert len(self.get_validated_stack_errors(ResourceError)) == 4
 
     def test_deprecated_warnings(self):
         with warnings.catch_warnings(record=True) as warnings_:
@@ -128,9 +175,17 @@ class TestLintingFeatures(unittest.TestCase):
             for warning_ in warnings_:
                 assert issubclass(warning_.category, PendingDeprecationWarning)
 
+    def test_deprecated_warnings_without_rules(self):
+        with warnings.catch_warnings(record=True) as warnings_:
+            warnings.simplefilter("always")
+            stack = Stack(self.stack_path, self.interpolated_naming_file, None, self.globals_file)
+            stack.validate()
+        messages = [str(warning_.message) for warning_ in warnings_]
+        assert any('node3' in message for message in messages)
+        assert any('node4' in message for message in messages)
+
     def test_error_messages(self):
-        stack = Stack(self.stack_path, self.naming_file, self.positioning_file, self.globals_file)
-        stack.validate()
+        stack = self.get_validated_stack()
         for error in stack.errors:
             assert 'not followed on file' in str(error)
 
@@ -185,6 +240,11 @@ class TestParsingFeatures(unittest.TestCase):
     def test_resource_exists(self):
         assert self.hcl_view.resources.get('aws_instance').get('bar2') == {'value4': 4, 'value3': 3}
 
+    def test_counter_resource_data(self):
+        assert self.hcl_view.get_counter_resource_data_by_type('aws_instance', 'foo') == [{'value2': 2, 'value': 1},
+                                                                                          {'value3': 3, 'value4': 4}]
+        assert self.hcl_view.get_counter_resource_data_by_type('aws_instance', 'baz') == []
+
     def test_simple_variable_interpolation(self):
         assert self.hcl_view.get_variable_value('${var.parrot}') == 'blah'
 
@@ -194,6 +254,11 @@ class TestParsingFeatures(unittest.TestCase):
     def test_list_variable_interpolation(self):
         assert self.hcl_view.get_variable_value('${var.list_var[1]}') == 'two'
 
+    def test_arithmetic_expression_evaluation(self):
+        assert evaluate_arithmetic_expression(' 0 + 1') == 1
+        assert evaluate_arithmetic_expression('"text"') == 'text'
+        self.assertRaises(ValueError, evaluate_arithmetic_expression, '__import__("os")')
+
     def test_missing_variables(self):
         self.assertRaises(MissingVariable, self.hcl_view.get_variable_value, '${var.not_existing}')
 
@@ -201,20 +266,63 @@ class TestParsingFeatures(unittest.TestCase):
         hcl_view = HclView(self.default_resources, self.default_global_variables, raise_on_missing_variable=False)
         assert hcl_view.get_variable_value('${var.not_existing}') == '${var.not_existing}'
 
+    def test_recursive_update_leaves_sources_untouched(self):
+        source = RecursiveDictionary({'x': RecursiveDictionary({'y': 1})})
+        merged = RecursiveDictionary()
+        merged.update(source)
+        merged.update({'x': {'z': 2}})
+        merged.update({'x': {'w': 3}})
+        assert merged == {'x': {'y': 1, 'z': 2, 'w': 3}}
+        assert source == {'x': {'y': 1}}
+
+    def test_recursive_update_last_value_wins(self):
+        merged = RecursiveDictionary({'k': {'v': 0}})
+        merged.update([('k', {'v': 1}), ('k', {'v': 2})])
+        assert merged == {'k': {'v': 2}}
+
+    def test_hcl_parser_per_thread(self):
+        parsers = []
+        thread = threading.Thread(target=lambda: parsers.append(get_hcl_parser()))
+        thread.start()
+        thread.join()
+        assert get_hcl_parser() is get_hcl_parser()
+        assert parsers[0] is not get_hcl_parser()
+
+    def test_parsed_files_are_not_shared(self):
+        stack_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'testing', 'stack')
+        globals_file = os.path.join(stack_path, 'global.tfvars')
+        first_parser = Parser(stack_path, globals_file)
+        for data in first_parser.file_resources:
+            data.setdefault('resource', {})['injected_resource'] = {'injected': {}}
+        second_parser = Parser(stack_path, globals_file)
+        assert 'injected_resource' not in second_parser.hcl_view.resources
+        variables = next(data['variable'] for data in second_parser.file_resources if 'variable' in data)
+        assert variables['value'] == 'interpolated_value'
+
 
 class TestTestingFeatures(unittest.TestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
-        Test set up
+        Test class set up
 
-        This is where you can setup things that you use throughout the tests. This method is called before every test.
+        This is where you can setup things that you use throughout the tests. This method is called once before all the
+        tests of the class.
         """
         current_dir = os.path.dirname(os.path.abspath(__file__))
         fixtures = os.path.join(current_dir, 'fixtures', 'testing')
-        self.stack_path = os.path.join(fixtures, 'stack')
-        self.globals_file = os.path.join(self.stack_path, 'global.tfvars')
-        self.validator = Validator(self.stack_path, self.globals_file, raise_on_missing_variable=True)
+        cls.stack_path = os.path.join(fixtures, 'stack')
+        cls.globals_file = os.path.join(cls.stack_path, 'global.tfvars')
+        cls.validator = Validator(cls.stack_path, cls.globals_file, raise_on_missing_variable=True)
+
+    def setUp(self):
+        """
+        Test set up
+
+        The validator is shared by all the tests so the setting some of them change is reset before every test.
+        """
+        self.validator.error_on_missing_attribute = False
 
     def test_resource_parsing(self):
         assert len(self.validator.resources('random_resource')._entities) == 1
@@ -224,6 +332,12 @@ class TestTestingFeatures(unittest.TestCase):
         assert len(self.validator.resources(['random_resource',
                                              'random_resource_other']).resources('random_resource')._entities) == 1
 
+    def test_resources_are_built_once_per_type(self):
+        first = self.validator.resources('azurerm_virtual_machine')._entities
+        second = self.validator.resources(['azurerm_virtual_machine', 'random_resource'])._entities
+        assert all(entity in second for entity in first)
+        assert first[0] is self.validator.resources('azurerm_virtual_machine')._entities[0]
+
     def test_data_parsing(self):
         assert len(self.validator.data('terraform_remote_state')._entities) == 1
         assert len(self.validator.data('vault_generic_secret')._entities) == 1
@@ -256,6 +370,10 @@ class TestTestingFeatures(unittest.TestCase):
         with self.assertRaises(AssertionError):
             validator.resources('random_resource').attribute('garbage')
 
+    def test_nested_attribute_of_plain_value(self):
+        tags = self.validator.resources('random_resource').attribute('tags')
+        assert tags.attribute('random').attribute('garbage').attributes == []
+
     def test_variable_accessing(self):
         assert self.validator.variable('image-aws-rhel74').value == 'ami-bb9a6bc2'
 
@@ -274,6 +392,14 @@ class TestTestingFeatures(unittest.TestCase):
             self.validator.resources('random_resource').should_have_attributes(['garbage', 'more'])
         self.validator.error_on_missing_attribute = False
 
+    def test_attribute_raise_lists_all_missing(self):
+        with self.assertRaises(AssertionError) as context:
+            self.validator.resources('random_resource').should_have_attributes(['garbage', 'more', 'tags'])
+        message = str(context.exception)
+        assert "should have attribute: 'garbage'" in message
+        assert "should have attribute: 'more'" in message
+        assert "'tags'" not in message
+
     def test_attribute_raise_on_existing(self):
         self.validator.error_on_missing_attribute = True
         with self.assertRaises(AssertionError):
@@ -288,6 +414,11 @@ class TestTestingFeatures(unittest.TestCase):
     def test_filtering_on_attribute(self):
         assert len(self.validator.resources('azurerm_virtual_machine').if_has_attribute('tags')._entities) == 3
 
+    def test_filtering_keeps_name_order(self):
+        azurerm_virtual_machine = self.validator.resources('azurerm_virtual_machine')
+        names = [entity.name for entity in azurerm_virtual_machine.if_has_attribute('tags')._entities]
+        assert names == sorted(names)
+
     def test_filtering_on_missing_attribute(self):
         azurerm_virtual_machine = self.validator.resources('azurerm_virtual_machine')
         assert len(azurerm_virtual_machine.if_not_has_attribute('not_matching')._entities) == 2